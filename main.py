@@ -1,103 +1,301 @@
 import asyncio
-import json
+import concurrent.futures
+import collections
 import httpx
-import queue
+import orjson
 import threading
 from threading import Thread
 import sounddevice as sd
 import re
+import string
+import numpy as np
 from kokoro import KPipeline
+from sentence_transformers import SentenceTransformer
 from multiprocessing import Queue
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import time
 from tracking import TrackingSystem
 import traceback
 
+_RE_WHITESPACE = re.compile(r"\s+")
+_PUNCT_TABLE = str.maketrans("", "", string.punctuation)
+_RE_STRIP = re.compile(r'\*[^*]*\*|[\U00010000-\U0010FFFF]')
+_RE_SPEAKER = re.compile(r'^[^:]+:\s+')
+_RE_SENT = re.compile(r'(?<=[.!?])\s+')
+
+_GREETINGS = {
+    "hi": "Hi there! Welcome to the stream.",
+    "hello": "Hello! Lovely to see you here.",
+    "hey": "Hey! Glad you dropped by.",
+    "yo": "Yo! Make yourself at home.",
+    "good morning": "Good morning! Hope your day is off to a great start.",
+    "good evening": "Good evening! Thanks for spending it with me.",
+    "gn": "Good night! Sleep well.",
+    "good night": "Good night! Sleep well.",
+}
+
 def load_config():
-    with open("config.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open("config.json", "rb") as f:
+        return orjson.loads(f.read())
 
 class AudioPlayer:
-    def __init__(self, max_queue_size: int = 10):
-        self.audio_queue = queue.Queue(maxsize=max_queue_size)
-        self.is_speaking = False
-        self.should_stop = False
-        self._start_audio_thread()
-
-    def _start_audio_thread(self):
-        self.audio_thread = threading.Thread(target=self._audio_player_loop, daemon=True)
-        self.audio_thread.start()
-
-    def _audio_player_loop(self):
-        while not self.should_stop:
-            try:
-                audio_data = self.audio_queue.get(timeout=1)
-                if audio_data is None:
-                    continue
-                
-                self.is_speaking = True
-                sd.play(audio_data, samplerate=24000)
-                sd.wait()
-                self.is_speaking = False
-                
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Error playing audio: {e}")
-                self.is_speaking = False
+    def __init__(self, samplerate: int = 24000, blocksize: int = 1024, max_buffer_seconds: float = 120.0):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.capacity = int(max_buffer_seconds * samplerate)
+        # Preallocated ring buffer reused across utterances. Single producer (the TTS thread)
+        # advances _write_pos, single consumer (the PortAudio callback) advances _read_pos,
+        # each only after its copy is done, so no lock is needed.
+        self._ring = np.zeros(self.capacity, dtype=np.float32)
+        self._write_pos = 0
+        self._read_pos = 0
+        self.idle = threading.Event()
+        self.idle.set()
+        self._stream = sd.OutputStream(
+            samplerate=samplerate,
+            channels=1,
+            dtype="float32",
+            blocksize=blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    @property
+    def is_speaking(self) -> bool:
+        return not self.idle.is_set()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        available = self._write_pos - self._read_pos
+        n = min(frames, available)
+        if n == 0:
+            out.fill(0)
+            # The last queued samples have been handed to the device by now
+            if not self.idle.is_set():
+                self.idle.set()
+                # play() may have published samples and cleared idle since we read the
+                # positions; undo the set so await_idle() does not return mid-reply
+                if self._write_pos != self._read_pos:
+                    self.idle.clear()
+            return
+
+        start = self._read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        np.copyto(out[:first], self._ring[start:start + first])
+        if n > first:
+            np.copyto(out[first:n], self._ring[:n - first])
+        if n < frames:
+            out[n:].fill(0)
+        self._read_pos += n
+
+    async def await_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been played."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.idle.wait, timeout)
 
     def play(self, audio_data):
-        try:
-            self.audio_queue.put(audio_data, block=False)
-        except queue.Full:
+        audio = np.asarray(audio_data, dtype=np.float32).ravel()
+        n = len(audio)
+        if self._write_pos - self._read_pos + n > self.capacity:
             print("Audio queue is full, skipping...")
+            return
+
+        start = self._write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        np.copyto(self._ring[start:start + first], audio[:first])
+        if n > first:
+            np.copyto(self._ring[:n - first], audio[first:])
+        self._write_pos += n
+        # Clear only after publishing, so the callback's re-check after setting idle
+        # always sees these samples; it sets idle again once they have drained
+        self.idle.clear()
 
     def stop(self):
-        self.should_stop = True
-        self.audio_queue.put(None)
-        if self.audio_thread.is_alive():
-            self.audio_thread.join(timeout=1)
+        self._read_pos = self._write_pos
+        self.idle.set()
+        try:
+            self._stream.stop()
+            self._stream.close()
+        except Exception as e:
+            print(f"Error closing audio stream: {e}")
 
 class ResponseCache:
-    def __init__(self, cache_size: int = 100, similarity_threshold: float = 0.8):
-        self.cache: Dict[str, str] = {}
+    def __init__(self, cache_size: int = 100, similarity_threshold: float = 0.85,
+                 model_name: str = "all-MiniLM-L6-v2"):
+        # Insertion order doubles as recency order: hits move to the end, eviction pops the front
+        self.cache: collections.OrderedDict[str, int] = collections.OrderedDict()
+        self._exact: Dict[str, str] = {}
         self.cache_size = cache_size
         self.similarity_threshold = similarity_threshold
+        self.encoder = SentenceTransformer(model_name)
+        dim = self.encoder.get_sentence_embedding_dimension()
+        # One normalized embedding per row, so a lookup is a single matmul
+        self._vectors = np.zeros((cache_size, dim), dtype=np.float32)
+        self._queries: List[Optional[str]] = [None] * cache_size
+        self._responses: List[Optional[str]] = [None] * cache_size
+        self.stats = {"hits": 0, "equal_hits": 0, "misses": 0}
+
+    def summary(self) -> str:
+        """Hit counters in a form suitable for the tracking log."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hits = self.stats["hits"]
+        exact_ratio = self.stats["equal_hits"] / hits if hits else 0.0
+        return (f"{hits}/{lookups} hits, {self.stats['equal_hits']} exact "
+                f"({exact_ratio:.0%} of hits), {self.stats['misses']} misses")
+
+    def _norm(self, query: str) -> str:
+        """Lowercase, strip punctuation and collapse whitespace for the exact-match tier."""
+        return _RE_WHITESPACE.sub(" ", query.lower().translate(_PUNCT_TABLE)).strip()
+
+    def _encode_sync(self, query: str) -> np.ndarray:
+        return self.encoder.encode([query], normalize_embeddings=True)[0].astype(np.float32)
+
+    async def _encode(self, query: str) -> np.ndarray:
+        """Embed off the event loop; the model forward pass blocks for milliseconds."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._encode_sync, query)
+
+    async def get(self, query: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """Return (cached response, query embedding).
+
+        The embedding is None when no encode was needed; pass it back to add() on a
+        miss so the same query is not embedded twice.
+        """
+        cached_query = self._exact.get(self._norm(query))
+        if cached_query is not None:
+            self.stats["hits"] += 1
+            self.stats["equal_hits"] += 1
+            self.cache.move_to_end(cached_query)
+            return self._responses[self.cache[cached_query]], None
+        if not self.cache:
+            self.stats["misses"] += 1
+            return None, None
+
+        vector = await self._encode(query)
+        scores = self._vectors @ vector
+        row = int(np.argmax(scores))
+        if self._queries[row] is not None and scores[row] > self.similarity_threshold:
+            self.stats["hits"] += 1
+            self.cache.move_to_end(self._queries[row])
+            return self._responses[row], vector
+        self.stats["misses"] += 1
+        return None, vector
+
+    async def add(self, query: str, response: str, vector: Optional[np.ndarray] = None):
+        if query not in self.cache and vector is None:
+            vector = await self._encode(query)
+
+        # Re-check after the await: another task may have cached the same query meanwhile
+        if query in self.cache:
+            row = self.cache[query]
+            self.cache.move_to_end(query)
+            self._responses[row] = response
+            return
 
-    def _compute_similarity(self, s1: str, s2: str) -> float:
-        words1 = set(s1.lower().split())
-        words2 = set(s2.lower().split())
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        return intersection / union if union > 0 else 0
-
-    def get(self, query: str) -> Optional[str]:
-        for cached_query, response in self.cache.items():
-            if self._compute_similarity(query, cached_query) > self.similarity_threshold:
-                return response
-        return None
-
-    def add(self, query: str, response: str):
         if len(self.cache) >= self.cache_size:
-            self.cache.pop(next(iter(self.cache)))
-        self.cache[query] = response
+            oldest, row = self.cache.popitem(last=False)
+            if self._exact.get(self._norm(oldest)) == oldest:
+                del self._exact[self._norm(oldest)]
+        else:
+            row = len(self.cache)
+
+        self.cache[query] = row
+        key = self._norm(query)
+        if key:
+            self._exact[key] = query
+        self._vectors[row] = vector
+        self._queries[row] = query
+        self._responses[row] = response
 
 class AIVtuber:
     def __init__(self, config, message_queue: Queue, tracking_system: TrackingSystem):
         self.config = config
         self.deepseek_api_key = config["api_settings"]["deepseek_api_key"]
         self.tts_pipeline = KPipeline(lang_code=config["voice_settings"]["language_code"])
+        self._tts_exec = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
         self.audio_player = AudioPlayer()
         self.message_queue = message_queue
+        self._async_q: asyncio.Queue = asyncio.Queue(maxsize=16)
+        self._sem = asyncio.Semaphore(4)
+        self._pending: Dict[str, List[str]] = {}
+        self.coalesce_window = 1.0
         self.response_cache = ResponseCache()
         self.processing_lock = asyncio.Lock()
         self.last_response_time = 0
         self.rate_limit_delay = 1
         self.tracking = tracking_system
+        self._tts_exec.submit(self._warm_up_tts)
+        self._system_prompt = self._build_system_prompt()
+        self._headers = {
+            "Authorization": f"Bearer {self.deepseek_api_key}",
+            "Content-Type": "application/json"
+        }
+        self._sys_msg = {"role": "system", "content": self._system_prompt}
+        self._payload_template = {
+            "model": config["api_settings"]["model"],
+            "temperature": config["api_settings"]["temperature"],
+            "max_tokens": 100
+        }
+        self._http = httpx.AsyncClient(
+            http2=True,
+            headers=self._headers,
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+            timeout=httpx.Timeout(connect=5.0, read=15.0, write=5.0, pool=5.0)
+        )
         
         with open("output.txt", "w", encoding="utf-8") as f:
             f.write("")
 
+    def _build_system_prompt(self) -> str:
+        """Build the character prompt once; it only depends on static config."""
+        personality_guidelines = "Your personality traits:\n"
+        for trait, description in self.config["character"]["personality_traits"].items():
+            personality_guidelines += f"- {trait}: {description}\n"
+
+        response_guidelines = "\nResponse handling guidelines:\n"
+        for situation, details in self.config["character"]["response_handling"].items():
+            if not details:
+                continue
+            response_guidelines += f"- For {situation}: {details['description']}\n"
+            response_guidelines += f"  Example: {details['example']}\n"
+
+        return (
+            f"{self.config['character']['system_prompt']}\n\n"
+            f"{personality_guidelines}\n"
+            f"{response_guidelines}\n\n"
+            "Remember to be concise and natural in your responses. "
+            "Aim to complete your thoughts within 1-2 sentences while maintaining "
+            "your characteristic wit and intelligence."
+        )
+
+    def _warm_up_tts(self):
+        """Run one throwaway synthesis on the TTS thread so the first viewer reply is not slowed by model setup."""
+        try:
+            for _ in self.tts_pipeline(
+                ".",
+                voice=self.config["voice_settings"]["voice_id"],
+                speed=self.config["voice_settings"]["speed"]
+            ):
+                break
+        except Exception as e:
+            self.tracking.track_error(f"TTS warm-up failed: {str(e)}")
+
+    def _should_direct_respond(self, message: str) -> Optional[Tuple[str, bool]]:
+        """Answer trivial messages without the API.
+
+        Returns None when the message needs the model, otherwise a (reply, cacheable)
+        pair. An empty reply marks noise that should be ignored; cacheable replies may
+        be stored in the response cache for similar messages.
+        """
+        text = _RE_WHITESPACE.sub(" ", _RE_STRIP.sub("", message).lower().translate(_PUNCT_TABLE)).strip()
+        if text in _GREETINGS:
+            return _GREETINGS[text], True
+        # Emoji (in any Unicode block, with or without variation selectors) and punctuation
+        # are never alphanumeric, so this catches pure-noise messages directly
+        if not any(ch.isalnum() for ch in text) or len(text) < 3:
+            return "", False
+        if len(message) > self.config["api_settings"].get("max_input_length", 300):
+            return "That's quite a lot to take in at once! Could you keep it a little shorter?", False
+        return None
+
     def _write_subtitle(self, text: str):
         """Write response to output.txt, overwriting previous content"""
         try:
@@ -108,91 +306,74 @@ class AIVtuber:
 
     def _clean_response(self, text: str) -> str:
         """Clean and format the response text."""
-        text = re.sub(r'[\U00010000-\U0010FFFF]', '', text, flags=re.UNICODE)
-        text = re.sub(r'\*[^*]*\*', '', text)
-        text = re.sub(r'^[^:]+:\s+', '', text)
+        text = _RE_STRIP.sub('', text)
+        text = _RE_SPEAKER.sub('', text, count=1)
         text = text.strip()
 
-        if len(text) > self.config["api_settings"]["max_response_length"]:
-            sentences = re.split(r'(?<=[.!?])\s+', text)
-            result = ""
-            for sentence in sentences:
-                if len(result + sentence) <= self.config["api_settings"]["max_response_length"]:
-                    result += sentence + " "
-                else:
+        max_length = self.config["api_settings"]["max_response_length"]
+        if len(text) > max_length:
+            kept = []
+            length = 0
+            for sentence in _RE_SENT.split(text):
+                if length + len(sentence) > max_length:
                     break
-            return result.strip()
+                kept.append(sentence)
+                length += len(sentence) + 1
+            return " ".join(kept).strip()
         
         return text
 
     async def _call_deepseek_api(self, user_message: str) -> str:
         """Call Deepseek API with optimized timeout and caching."""
+        max_retries = 3
         try:
+            cached, query_vector = await self.response_cache.get(user_message)
+            if cached is not None:
+                self.tracking.track_workflow(
+                    "API", f"Cache hit for: {user_message[:50]}... ({self.response_cache.summary()})"
+                )
+                return cached
+
             self.tracking.track_workflow("API", f"Starting API call for: {user_message[:50]}...")
             
-            headers = {
-                "Authorization": f"Bearer {self.deepseek_api_key}",
-                "Content-Type": "application/json"
-            }
-
-            personality_guidelines = "Your personality traits:\n"
-            for trait, description in self.config["character"]["personality_traits"].items():
-                personality_guidelines += f"- {trait}: {description}\n"
-
-            response_guidelines = "\nResponse handling guidelines:\n"
-            for situation, details in self.config["character"]["response_handling"].items():
-                response_guidelines += f"- For {situation}: {details['description']}\n"
-                response_guidelines += f"  Example: {details['example']}\n"
-
-            enhanced_prompt = (
-                f"{self.config['character']['system_prompt']}\n\n"
-                f"{personality_guidelines}\n"
-                f"{response_guidelines}\n\n"
-                "Remember to be concise and natural in your responses. "
-                "Aim to complete your thoughts within 1-2 sentences while maintaining "
-                "your characteristic wit and intelligence. "
-                f"User message: {user_message}"
-            )
-
-            payload = {
-                "model": self.config["api_settings"]["model"],
-                "messages": [
-                    {"role": "system", "content": enhanced_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                "temperature": self.config["api_settings"]["temperature"],
-                "max_tokens": 100
-            }
-
-            max_retries = 3
+            body = orjson.dumps({
+                **self._payload_template,
+                "messages": [self._sys_msg, {"role": "user", "content": user_message}]
+            })
+
             for attempt in range(max_retries):
                 try:
                     timeout = 15.0 * (attempt + 1)
                     self.tracking.track_workflow("API", f"Attempt {attempt + 1}/{max_retries} with {timeout}s timeout")
                     
-                    async with httpx.AsyncClient(timeout=timeout) as client:
-                        response = await client.post(
-                            "https://api.deepseek.com/v1/chat/completions",
-                            headers=headers,
-                            json=payload
-                        )
+                    response = await self._http.post(
+                        "https://api.deepseek.com/v1/chat/completions",
+                        content=body,
+                        # Only the read timeout grows per attempt; keep the client's other limits
+                        timeout=httpx.Timeout(timeout, connect=5.0, write=5.0, pool=5.0)
+                    )
                         
-                        if response.status_code == 200:
-                            response_data = response.json()
-                            self.tracking.track_workflow("API", "Success: Got response from API")
-                            return self._clean_response(response_data["choices"][0]["message"]["content"])
-                        else:
-                            error_msg = f"API error {response.status_code}: {response.text}"
-                            self.tracking.track_error(error_msg)
-                            if attempt == max_retries - 1:
-                                raise Exception(error_msg)
-                            continue
-
-                except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
-                    self.tracking.track_error(f"Timeout on attempt {attempt + 1}: {str(e)}")
+                    if response.status_code == 200:
+                        response_data = orjson.loads(response.content)
+                        self.tracking.track_workflow("API", "Success: Got response from API")
+                        response_text = self._clean_response(response_data["choices"][0]["message"]["content"])
+                        await self.response_cache.add(user_message, response_text, query_vector)
+                        return response_text
+                    else:
+                        error_msg = f"API error {response.status_code}: {response.text}"
+                        self.tracking.track_error(error_msg)
+                        if attempt == max_retries - 1:
+                            raise Exception(error_msg)
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+
+                except httpx.TransportError as e:
+                    # Timeouts plus stale pooled connections (protocol/read/connect errors)
+                    kind = "Timeout" if isinstance(e, httpx.TimeoutException) else "Transport error"
+                    self.tracking.track_error(f"{kind} on attempt {attempt + 1}: {str(e)}")
                     if attempt == max_retries - 1:
                         raise
-                    await asyncio.sleep(1 * (attempt + 1))
+                    await asyncio.sleep(2 ** attempt)
                     continue
 
         except Exception as e:
@@ -210,33 +391,58 @@ class AIVtuber:
                     voice=self.config["voice_settings"]["voice_id"],
                     speed=self.config["voice_settings"]["speed"]
                 )
-                return next(generator)[2]
+                # Hand each chunk to the player as soon as it is synthesized so playback overlaps synthesis
+                for _, _, audio in generator:
+                    if audio is not None:
+                        # No-op for CPU-resident contiguous tensors, so numpy() shares the tensor's buffer
+                        self.audio_player.play(audio.detach().cpu().contiguous().numpy())
 
-            audio = await asyncio.get_event_loop().run_in_executor(None, _generate_audio)
-            if audio is not None:
-                self.audio_player.play(audio.numpy())
+            await asyncio.get_event_loop().run_in_executor(self._tts_exec, _generate_audio)
         except Exception as e:
             self.tracking.track_error(f"TTS error: {str(e)}")
 
+    def _start_queue_bridge(self, loop: asyncio.AbstractEventLoop):
+        """Forward items from the cross-thread message queue onto the asyncio queue."""
+        def _pump():
+            while True:
+                chat_item = self.message_queue.get()
+                try:
+                    # Blocks while the asyncio queue is full; message_queue then fills and
+                    # the tracking side stops draining, eventually blocking the chat reader
+                    asyncio.run_coroutine_threadsafe(self._async_q.put(chat_item), loop).result()
+                except (RuntimeError, concurrent.futures.CancelledError):
+                    # Loop closed, or asyncio.run cancelled the pending put on shutdown
+                    return
+
+        Thread(target=_pump, daemon=True).start()
+
     async def process_chat(self):
         """Process chat messages with rate limiting and concurrent processing."""
         print("Starting chat processing...")
         pending_tasks = set()
 
-        async def process_message(chat_item):
+        async def process_message(chat_item, direct_response: Optional[Tuple[str, bool]] = None):
             try:
+                username = chat_item["author"]
+                message = chat_item["message"]
+
                 async with self.processing_lock:
                     current_time = time.time()
                     if current_time - self.last_response_time < self.rate_limit_delay:
                         await asyncio.sleep(self.rate_limit_delay - (current_time - self.last_response_time))
 
-                    username = chat_item["author"]
-                    message = chat_item["message"]
                     print(f"Processing message from {username}: {message}")
 
-                    print("Calling Deepseek API...")
-                    response = await self._call_deepseek_api(message)
-                    print(f"API Response received: {response}")
+                    if direct_response is not None:
+                        response, cacheable = direct_response
+                        print(f"Direct response: {response}")
+                        if cacheable:
+                            # Lets longer greetings like "hello everyone" hit the semantic cache
+                            await self.response_cache.add(message, response)
+                    else:
+                        print("Calling Deepseek API...")
+                        response = await self._call_deepseek_api(message)
+                        print(f"API Response received: {response}")
 
                     if response:
                         self._write_subtitle(response)
@@ -244,34 +450,68 @@ class AIVtuber:
                         print("Converting to speech...")
                         await self._text_to_speech_async(response)
                         print("Speech conversion complete")
+                        # Hold the lock until playback ends so the rate limit counts from real speech end
+                        await self.audio_player.await_idle(timeout=60)
                     else:
                         print("Received empty response from API")
 
                     self.last_response_time = time.time()
             except Exception as e:
+                # Handled here rather than propagated: a failure inside the TaskGroup
+                # would cancel every sibling task
                 print(f"Error in process_message: {e}")
                 traceback.print_exc()
-
-        while True:
-            try:
-                if not self.message_queue.empty():
-                    chat_item = self.message_queue.get()
+                self.tracking.track_error(f"process_message failed: {e!r}")
+
+        loop = asyncio.get_running_loop()
+        self._start_queue_bridge(loop)
+        async with asyncio.TaskGroup() as task_group:
+            def on_done(task):
+                pending_tasks.discard(task)
+                self._sem.release()
+
+            def submit(chat_item, direct_response: Optional[Tuple[str, bool]] = None):
+                task = task_group.create_task(process_message(chat_item, direct_response))
+                pending_tasks.add(task)
+                task.add_done_callback(on_done)
+
+            def flush_author(author):
+                messages = self._pending.pop(author, None)
+                if messages:
+                    submit({"author": author, "message": " | ".join(messages)})
+
+            def buffer_message(chat_item):
+                """Collect a viewer's burst of model-bound messages into one request."""
+                author = chat_item["author"]
+                messages = self._pending.get(author)
+                if messages is None:
+                    self._pending[author] = [chat_item["message"]]
+                    loop.call_later(self.coalesce_window, flush_author, author)
+                elif messages[-1] != chat_item["message"]:
+                    messages.append(chat_item["message"])
+
+            while True:
+                try:
+                    chat_item = await self._async_q.get()
                     print(f"Got message from queue: {chat_item}")
-                    
-                    task = asyncio.create_task(process_message(chat_item))
-                    pending_tasks.add(task)
-                    task.add_done_callback(pending_tasks.discard)
-
-                done_tasks = {task for task in pending_tasks if task.done()}
-                for task in done_tasks:
-                    if task.exception():
-                        print(f"Task failed with error: {task.exception()}")
-                pending_tasks.difference_update(done_tasks)
-
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                print(f"Error in main loop: {e}")
-                traceback.print_exc()
+                    # Classify each message on its own so noise and canned replies never
+                    # end up inside a joined burst sent to the model
+                    direct_response = self._should_direct_respond(chat_item["message"])
+                    if direct_response is not None and not direct_response[0]:
+                        print(f"Ignoring low-content message from {chat_item['author']}: {chat_item['message']}")
+                        continue
+
+                    if direct_response is not None or chat_item["author"] not in self._pending:
+                        # Each new request holds a slot until its task finishes; while all
+                        # slots are busy the queue fills and the bridge thread blocks
+                        await self._sem.acquire()
+                    if direct_response is not None:
+                        submit(chat_item, direct_response)
+                    else:
+                        buffer_message(chat_item)
+                except Exception as e:
+                    print(f"Error in main loop: {e}")
+                    traceback.print_exc()
 
     async def run(self):
         print("Starting AI Vtuber...")
@@ -280,12 +520,15 @@ class AIVtuber:
         except asyncio.CancelledError:
             print("AI process was interrupted.")
         finally:
+            print(f"Response cache: {self.response_cache.summary()}")
+            await self._http.aclose()
+            self._tts_exec.shutdown(wait=False, cancel_futures=True)
             self.audio_player.stop()
 
 def main():
     config = load_config()
     print("Config loaded:", config)
-    message_queue = Queue()
+    message_queue = Queue(maxsize=64)
 
     tracking_system = TrackingSystem(
         video_id=config["youtube_settings"]["video_id"],
@@ -1,9 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-import json
+import collections
 import os
+import time
 from datetime import datetime
 import queue
+import threading
+import orjson
 import pytchat
 
 class TrackingSystem:
@@ -16,12 +19,32 @@ class TrackingSystem:
         self.message_queue = message_queue
         self.video_id = video_id
         self.chat = None
+        # Bounded so a chat flood blocks the reader thread instead of growing memory
+        self._chat_items = queue.Queue(maxsize=64)
+        self._held_chat = None
         
+        # In-memory history is bounded; the full record goes to append-only JSONL files
         self.tracking_data = {
-            "workflow": [],
-            "errors": [],
-            "chat_messages": []
+            "workflow": collections.deque(maxlen=2000),
+            "errors": collections.deque(maxlen=2000),
+            "chat_messages": collections.deque(maxlen=2000)
         }
+        self._log_files = {
+            key: open(os.path.join(self.tracking_dir, filename), "ab")
+            for key, filename in (("workflow", "workflow.jsonl"),
+                                  ("errors", "errors.jsonl"),
+                                  ("chat_messages", "chat.jsonl"))
+        }
+        self._last_save = time.monotonic()
+        # hash -> [first seen, suppressed repeats, stream, entry fields]
+        self._recent_hashes: collections.OrderedDict[int, list] = collections.OrderedDict()
+        self._repeat_pending: set[int] = set()
+        self.dedupe_window = 5.0
+
+        self._chat_buf: list[str] = []
+        self._wf_buf: list[str] = []
+        self._err_buf: list[str] = []
+        self._flush_scheduled = False
         
         self.root = tk.Tk()
         self.root.title("Corelia Tracking System")
@@ -30,6 +53,7 @@ class TrackingSystem:
         
         try:
             self.chat = pytchat.create(video_id=self.video_id)
+            threading.Thread(target=self._chat_reader_loop, daemon=True).start()
             self.root.after(100, self._check_chat)
         except Exception as e:
             self.track_error(f"Failed to initialize chat: {str(e)}")
@@ -66,35 +90,65 @@ class TrackingSystem:
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-    def _check_chat(self):
-        """Check for new chat messages in the main thread."""
-        try:
-            if self.chat and self.chat.is_alive():
-                for chat_item in self.chat.get().sync_items():
-                    message_data = {
+    def _chat_reader_loop(self):
+        """Fetch chat messages off the UI thread; pytchat blocks on network I/O."""
+        while True:
+            chat = self.chat
+            if chat is None or not chat.is_alive():
+                break
+            try:
+                for chat_item in chat.get().sync_items():
+                    self._put_chat_item({
                         "author": chat_item.author.name,
                         "message": chat_item.message
-                    }
-                    self.tracking_data["chat_messages"].append({
+                    })
+            except Exception as e:
+                self.track_error(f"Chat reader error: {str(e)}")
+                time.sleep(1)
+                continue
+            time.sleep(0.1)
+
+    def _put_chat_item(self, message_data: dict):
+        """Block the reader while the chat queue is full, waking periodically to notice shutdown."""
+        while self.chat is not None:
+            try:
+                self._chat_items.put(message_data, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def _check_chat(self):
+        """Drain messages fetched by the chat reader thread in the main thread."""
+        try:
+            while True:
+                if self._held_chat is None:
+                    try:
+                        message_data = self._chat_items.get_nowait()
+                    except queue.Empty:
+                        break
+                    self._record("chat_messages", {
                         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                         **message_data
                     })
                     self._add_chat_entry(message_data["author"], message_data["message"])
-                    self.message_queue.put(message_data)
+                    self._held_chat = message_data
+                # Never block the Tk thread: if the AI side is saturated, keep the item
+                # and retry next tick, letting _chat_items fill up behind it
+                try:
+                    self.message_queue.put_nowait(self._held_chat)
+                except queue.Full:
+                    break
+                self._held_chat = None
         except Exception as e:
-            self.track_error(f"Chat reader error: {str(e)}")
+            self.track_error(f"Chat queue error: {str(e)}")
         finally:
-            self.root.after(100, self._check_chat)
+            if self.chat is not None:
+                self.root.after(100, self._check_chat)
 
     def _add_chat_entry(self, author: str, message: str):
         """Add a chat message to the UI."""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        entry = f"[{timestamp}] {author}: {message}\n"
-        
-        self.chat_text.configure(state=tk.NORMAL)
-        self.chat_text.insert(tk.END, entry)
-        self.chat_text.see(tk.END)
-        self.chat_text.configure(state=tk.DISABLED)
+        self._chat_buf.append(f"[{timestamp}] {author}: {message}\n")
 
     def update(self):
         """Process queued updates"""
@@ -107,7 +161,12 @@ class TrackingSystem:
                 error_msg = self.error_queue.get_nowait()
                 self._add_error_entry(error_msg)
 
-            if datetime.now().second == 0:
+            self._sweep_repeats()
+
+            if self._chat_buf or self._wf_buf or self._err_buf:
+                self._schedule_flush()
+
+            if time.monotonic() - self._last_save >= 60:
                 self.save_tracking_data()
 
         except Exception as e:
@@ -115,34 +174,103 @@ class TrackingSystem:
 
         self.root.after(100, self.update)
 
+    def _coalesce(self, stream: str, fields: tuple) -> bool:
+        """Return False for a repeat inside the dedupe window; it is counted, not written."""
+        now = time.monotonic()
+        h = hash((stream, *fields))
+        seen = self._recent_hashes.get(h)
+        if seen is not None and now - seen[0] < self.dedupe_window:
+            seen[1] += 1
+            self._repeat_pending.add(h)
+            return False
+
+        if seen is not None:
+            self._emit_repeats(h, seen)
+        self._recent_hashes[h] = [now, 0, stream, fields]
+        self._recent_hashes.move_to_end(h)
+        while len(self._recent_hashes) > 512:
+            self._emit_repeats(*self._recent_hashes.popitem(last=False))
+        return True
+
+    def _emit_repeats(self, h: int, seen: list):
+        """Write a separate record for repeats suppressed in a finished window."""
+        self._repeat_pending.discard(h)
+        count, seen[1] = seen[1], 0
+        if count:
+            stream, fields = seen[2], seen[3]
+            if stream == "errors":
+                self._write_error_entry(*fields, repeated=count)
+            else:
+                self._write_workflow_entry(*fields, repeated=count)
+
+    def _sweep_repeats(self, force: bool = False):
+        now = time.monotonic()
+        for h in list(self._repeat_pending):
+            seen = self._recent_hashes.get(h)
+            if seen is None:
+                self._repeat_pending.discard(h)
+            elif force or now - seen[0] >= self.dedupe_window:
+                self._emit_repeats(h, seen)
+
     def _add_workflow_entry(self, phase: str, details: str):
+        if self._coalesce("workflow", (phase, details)):
+            self._write_workflow_entry(phase, details)
+
+    def _add_error_entry(self, error_msg: str):
+        if self._coalesce("errors", (error_msg,)):
+            self._write_error_entry(error_msg)
+
+    def _write_workflow_entry(self, phase: str, details: str, repeated: int = 0):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = f"[{timestamp}] {phase}: {details}\n"
-        
-        self.tracking_data["workflow"].append({
+        note = f" (previous entry repeated x{repeated})" if repeated else ""
+        self._wf_buf.append(f"[{timestamp}] {phase}: {details}{note}\n")
+
+        record = {
             "timestamp": timestamp,
             "phase": phase,
             "details": details
-        })
-
-        self.workflow_text.configure(state=tk.NORMAL)
-        self.workflow_text.insert(tk.END, entry)
-        self.workflow_text.see(tk.END)
-        self.workflow_text.configure(state=tk.DISABLED)
+        }
+        if repeated:
+            record["repeated"] = repeated
+        self._record("workflow", record)
 
-    def _add_error_entry(self, error_msg: str):
+    def _write_error_entry(self, error_msg: str, repeated: int = 0):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = f"[{timestamp}] ERROR: {error_msg}\n"
-        
-        self.tracking_data["errors"].append({
+        note = f" (previous entry repeated x{repeated})" if repeated else ""
+        self._err_buf.append(f"[{timestamp}] ERROR: {error_msg}{note}\n")
+
+        record = {
             "timestamp": timestamp,
             "error": error_msg
-        })
+        }
+        if repeated:
+            record["repeated"] = repeated
+        self._record("errors", record)
 
-        self.error_text.configure(state=tk.NORMAL)
-        self.error_text.insert(tk.END, entry)
-        self.error_text.see(tk.END)
-        self.error_text.configure(state=tk.DISABLED)
+    def _record(self, key: str, record: dict):
+        self.tracking_data[key].append(record)
+        log_file = self._log_files[key]
+        if not log_file.closed:
+            log_file.write(orjson.dumps(record) + b"\n")
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after_idle(self._flush_ui)
+
+    def _flush_ui(self):
+        """Write all buffered entries with one insert per widget."""
+        self._flush_scheduled = False
+        for text_widget, buf in ((self.workflow_text, self._wf_buf),
+                                 (self.error_text, self._err_buf),
+                                 (self.chat_text, self._chat_buf)):
+            if not buf:
+                continue
+            text_widget.configure(state=tk.NORMAL)
+            text_widget.insert(tk.END, "".join(buf))
+            text_widget.see(tk.END)
+            text_widget.configure(state=tk.DISABLED)
+            buf.clear()
 
     def track_workflow(self, phase: str, details: str):
         """Add a workflow tracking entry"""
@@ -153,18 +281,24 @@ class TrackingSystem:
         self.error_queue.put(error_msg)
 
     def save_tracking_data(self):
-        """Save tracking data to JSON files"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        tracking_file = os.path.join(self.tracking_dir, f"tracking_{timestamp}.json")
-        with open(tracking_file, 'w', encoding='utf-8') as f:
-            json.dump(self.tracking_data, f, indent=2)
+        """Flush the JSONL tracking logs to disk"""
+        self._last_save = time.monotonic()
+        for log_file in self._log_files.values():
+            if not log_file.closed:
+                log_file.flush()
 
     def on_closing(self):
         """Handle window closing"""
+        self._sweep_repeats(force=True)
         self.save_tracking_data()
-        if self.chat:
-            self.chat = None
+        for log_file in self._log_files.values():
+            log_file.close()
+        chat, self.chat = self.chat, None
+        if chat:
+            try:
+                chat.terminate()
+            except Exception as e:
+                print(f"Error stopping chat: {e}")
         self.root.destroy()
 
     def start(self):